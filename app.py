@@ -1,15 +1,142 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import joblib
+from joblib import Parallel, delayed
+import hashlib
+import io
 import os
 import datetime
-import seaborn as sns
 import matplotlib.pyplot as plt
-import plotly.express as px
 import plotly.graph_objects as go
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
-# 🎯 Load AI Model
-model = joblib.load("absenteeism_model.pkl")
+import fast_forest
+
+# 🎯 Load AI Model (cached so the pickle is read once per process, not on every rerun)
+@st.cache_resource
+def load_model():
+    return joblib.load("absenteeism_model.pkl")
+
+model = load_model()
+
+# ⚡ Packed forest for the Numba bulk-inference kernel (None when numba is absent)
+@st.cache_resource
+def load_packed_forest():
+    if fast_forest.NUMBA_AVAILABLE and hasattr(model, "estimators_"):
+        return fast_forest.pack_forest(model)
+    return None
+
+# 🔑 Fast cache keys: blake2b over raw buffers instead of Streamlit's recursive hasher,
+# which gets slow on large DataFrames/arrays
+def _hash_ndarray(arr: np.ndarray):
+    digest = hashlib.blake2b(np.ascontiguousarray(arr).tobytes(), digest_size=16).digest()
+    return (arr.shape, str(arr.dtype), digest)
+
+def _hash_dataframe(df: pd.DataFrame):
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return (tuple(df.columns), hashlib.blake2b(row_hashes.tobytes(), digest_size=16).digest())
+
+HASH_FUNCS = {pd.DataFrame: _hash_dataframe, np.ndarray: _hash_ndarray}
+
+# 📋 Known column dtypes (skips type inference for these during parsing)
+CSV_DTYPES = {
+    "Absenteeism_Days": "float64",
+    "Performance_Rating": "float64",
+    "Absenteeism Risk Score": "float64",
+    "Department": "string",
+}
+
+# 🚫 Columns excluded from model features (set for O(1) membership checks)
+NON_FEATURE_COLS = {"employee_id", "name", "absenteeism_risk"}
+
+# 🧠 Cached CSV Parsing (keyed on the raw upload bytes, so reruns skip re-parsing)
+# Also precomputes the employee-identifier column and feature columns once per dataset.
+@st.cache_data
+def parse_csv(data: bytes):
+    header = pd.read_csv(io.BytesIO(data), nrows=0).columns
+    dtypes = {col: dt for col, dt in CSV_DTYPES.items() if col in header}
+    df = pd.read_csv(io.BytesIO(data), engine="pyarrow", dtype=dtypes)
+    if "Department" in df.columns:
+        df["Department"] = df["Department"].astype("category")
+    search_column = next(
+        (col for col in df.columns if "id" in col.lower() or "name" in col.lower()),
+        None,
+    )
+    feature_cols = [col for col in df.columns if col.lower() not in NON_FEATURE_COLS]
+    return df, search_column, feature_cols
+
+# 🗂️ Cached Employee Index (id → row position, so lookups are O(1) instead of a full scan)
+@st.cache_data(hash_funcs=HASH_FUNCS)
+def build_index(df: pd.DataFrame, col: str) -> pd.Series:
+    return pd.Series(np.arange(len(df)), index=df[col].astype(str).values)
+
+# 🧮 Cached Feature Matrix (C-contiguous float32, halves the bytes the trees read)
+@st.cache_data(hash_funcs=HASH_FUNCS)
+def feature_matrix(df: pd.DataFrame, feature_cols: list) -> np.ndarray:
+    return np.ascontiguousarray(df[feature_cols].to_numpy(dtype=np.float32))
+
+# 🚀 Cached Bulk Inference (keyed on the feature matrix; widget toggles don't re-run the forest)
+@st.cache_data(show_spinner=False, hash_funcs=HASH_FUNCS)
+def bulk_predict(X: np.ndarray):
+    packed = load_packed_forest()
+    if packed is not None:
+        probs = fast_forest.predict_proba_packed(packed, X)
+    else:
+        # Threaded row chunks keep every core busy without pickling the forest
+        n_chunks = max(1, min(os.cpu_count() or 1, len(X)))
+        chunks = np.array_split(X, n_chunks)
+        probs = np.concatenate(
+            Parallel(n_jobs=-1, prefer="threads")(
+                delayed(model.predict_proba)(chunk) for chunk in chunks
+            )
+        )[:, 1]
+    return (probs >= 0.5).astype(np.int8), probs * 100
+
+# 📈 Cached Histogram Bins (O(N) binning paid once per dataset, not per rerun)
+@st.cache_data(hash_funcs=HASH_FUNCS)
+def hist_bins(col: np.ndarray, bins: int = 20):
+    col = col[np.isfinite(col)]  # np.histogram raises on NaN; HR data routinely has gaps
+    if col.size == 0:
+        return np.zeros(bins, dtype=np.int64), np.linspace(0.0, 1.0, bins + 1)
+    return np.histogram(col, bins=bins)
+
+# 👀 Cached Preview (plain unstyled frame; serialized once instead of every rerun)
+@st.cache_data(hash_funcs=HASH_FUNCS)
+def head10(df: pd.DataFrame) -> pd.DataFrame:
+    return df.head(10).copy()
+
+# 📊 Cached Aggregations (KPI math runs once per dataset, every rerun after is a cache hit)
+@st.cache_data(hash_funcs=HASH_FUNCS)
+def dept_sum(df: pd.DataFrame) -> pd.Series:
+    return df.groupby("Department", observed=True)["Absenteeism_Days"].sum()
+
+@st.cache_data(hash_funcs=HASH_FUNCS)
+def kpi_metrics(df: pd.DataFrame):
+    return (
+        len(df),
+        int((df["Absenteeism Risk Score"] > 75).sum()),
+        df["Absenteeism_Days"].mean(),
+        df["Absenteeism Risk Score"].mean(),
+    )
+
+# 💾 Cached CSV Serialization (Arrow writer; re-clicking Download doesn't reserialize)
+@st.cache_data(hash_funcs=HASH_FUNCS)
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+    return buf.getvalue()
+
+# 🔬 Scatter Downsampling (caps the points shipped to the browser per trace)
+MAX_SCATTER_POINTS = 5000
+
+@st.cache_data(hash_funcs=HASH_FUNCS)
+def downsample_xy(x: np.ndarray, y: np.ndarray, max_points: int = MAX_SCATTER_POINTS):
+    if len(x) <= max_points:
+        return x, y
+    idx = np.linspace(0, len(x) - 1, max_points).astype(np.intp)
+    return x[idx], y[idx]
 
 # 📂 Secure Storage
 DATA_DIR = "datasets"
@@ -19,7 +146,10 @@ if not os.path.exists(DATA_DIR):
 # 🛡️ Initialize Session Data
 if "df" not in st.session_state:
     st.session_state.df = None
+    st.session_state.search_column = None
+    st.session_state.feature_cols = None
     st.session_state.selected_employee = None
+    st.session_state.last_file_hash = None
 
 # 🎨 Streamlit UI Config
 st.set_page_config(page_title="AI Absenteeism Predictor", layout="wide")
@@ -33,15 +163,20 @@ st.markdown("---")
 uploaded_file = st.file_uploader("📁 Upload Employee CSV Data", type=["csv"], help="Upload your dataset for absenteeism analysis.")
 
 if uploaded_file:
-    # 🛡️ Secure Save
-    timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-    client_filename = f"Client_{timestamp}.csv"
-    file_path = os.path.join(DATA_DIR, client_filename)
-    with open(file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+    data = uploaded_file.getvalue()
+    file_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    # 🛡️ Secure Save (once per upload — skipped while the same file sits in the uploader)
+    if st.session_state.last_file_hash != file_hash:
+        timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        client_filename = f"Client_{timestamp}.csv"
+        file_path = os.path.join(DATA_DIR, client_filename)
+        with open(file_path, "wb") as f:
+            f.write(data)
+        st.session_state.last_file_hash = file_hash
 
     # 🚀 Load Dataset for This Session
-    st.session_state.df = pd.read_csv(uploaded_file)
+    st.session_state.df, st.session_state.search_column, st.session_state.feature_cols = parse_csv(data)
 
     # ✅ Success Message
     st.success("✅ File uploaded successfully!")
@@ -51,32 +186,32 @@ if st.session_state.df is None:
     st.warning("⚠️ No dataset uploaded yet. Please upload a CSV file.")
 else:
     df = st.session_state.df
+    search_column = st.session_state.search_column
+    feature_cols = st.session_state.feature_cols
 
     # 📌 Show First 10 Rows in Stylish Table
     st.subheader("📌 Preview of Uploaded Data")
-    st.dataframe(df.head(10))
+    st.dataframe(head10(df))
 
     # 🧑‍💼 Cards and KPI Section
+    total_employees, high_risk_employees, avg_absenteeism_days, avg_risk_score = kpi_metrics(df)
+    dept_totals = dept_sum(df)
+
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        total_employees = len(df)
         st.metric("Total Employees", total_employees)
 
     with col2:
-        high_risk_employees = len(df[df["Absenteeism Risk Score"] > 75])
         st.metric("High-Risk Employees", high_risk_employees)
 
     with col3:
-        avg_absenteeism_days = df["Absenteeism_Days"].mean()
         st.metric("Avg. Absenteeism Days", round(avg_absenteeism_days, 2))
 
     with col4:
-        dept_absenteeism = df.groupby("Department")["Absenteeism_Days"].sum().idxmax()
-        st.metric("Highest Absenteeism Department", dept_absenteeism)
+        st.metric("Highest Absenteeism Department", dept_totals.idxmax())
 
     # 🏢 KPI for Absenteeism Risk Score
-    avg_risk_score = df["Absenteeism Risk Score"].mean()
     st.subheader("📊 KPI: Average Absenteeism Risk Score")
     st.write(f"Avg. Absenteeism Risk Score for all employees: {avg_risk_score:.2f}%")
 
@@ -99,35 +234,82 @@ else:
 
     # 📈 Absenteeism Distribution
     st.subheader("📊 Absenteeism Trends")
+    counts, edges = hist_bins(df["Absenteeism_Days"].to_numpy())
     fig1, ax1 = plt.subplots(figsize=(8, 4))
-    sns.histplot(df["Absenteeism_Days"], bins=20, kde=True, color="skyblue", ax=ax1)
+    ax1.bar(edges[:-1], counts, width=np.diff(edges), align="edge", color="skyblue", edgecolor="white")
     ax1.set_title("Company Absenteeism Distribution")
+    ax1.set_xlabel("Absenteeism_Days")
+    ax1.set_ylabel("Count")
     st.pyplot(fig1)
 
     # 📊 Absenteeism by Department
     st.subheader("📊 Absenteeism by Department")
-    dept_data = df.groupby("Department")["Absenteeism_Days"].sum().reset_index()
-    fig2 = px.bar(dept_data, x="Department", y="Absenteeism_Days", title="Absenteeism by Department")
+    fig2 = go.Figure(go.Bar(
+        x=dept_totals.index.to_numpy(),
+        y=dept_totals.to_numpy()
+    ))
+    fig2.update_layout(title="Absenteeism by Department", xaxis_title="Department", yaxis_title="Absenteeism_Days")
     st.plotly_chart(fig2)
 
     # 📊 Performance vs Absenteeism Correlation
     st.subheader("📊 Performance vs Absenteeism Correlation")
-    fig3 = px.scatter(df, x="Performance_Rating", y="Absenteeism_Days", color="Department", title="Performance vs Absenteeism")
+    fig3 = go.Figure()
+    for dept, grp in df.groupby("Department", observed=True):
+        x, y = downsample_xy(grp["Performance_Rating"].to_numpy(), grp["Absenteeism_Days"].to_numpy())
+        fig3.add_trace(go.Scattergl(x=x, y=y, mode="markers", name=str(dept)))
+    fig3.update_layout(title="Performance vs Absenteeism", xaxis_title="Performance_Rating", yaxis_title="Absenteeism_Days")
     st.plotly_chart(fig3)
 
+    # 🔍 Employee Lookup (indexed, avoids rescanning the column on every keystroke)
+    if search_column:
+        st.subheader("🔍 Search Employee")
+        search_value = st.text_input(f"Enter {search_column}", help="Look up a single employee by their identifier.")
+        if search_value:
+            idx_map = build_index(df, search_column)
+            try:
+                employee_data = df.iloc[np.atleast_1d(idx_map[search_value])]
+            except KeyError:
+                st.error("❌ Employee not found. Please check the identifier and try again.")
+            else:
+                st.session_state.selected_employee = search_value
+                st.dataframe(employee_data)
+
+                # 🤖 Single-Employee Prediction (one predict_proba call gives both label & risk)
+                employee_features = employee_data[feature_cols].iloc[[0]]
+                proba = model.predict_proba(employee_features)[0]
+                prediction = int(proba[1] >= 0.5)
+                risk_prob = proba[1] * 100
+                if prediction:
+                    st.error(f"⚠️ High absenteeism risk: {risk_prob:.2f}%")
+                else:
+                    st.success(f"✅ Low absenteeism risk: {risk_prob:.2f}%")
+
+                # 📊 Employee Feature Profile (arrays straight into go.Bar, no melt reshape)
+                fig_emp = go.Figure(go.Bar(
+                    x=feature_cols,
+                    y=employee_features.iloc[0].to_numpy()
+                ))
+                fig_emp.update_layout(title=f"Feature Profile: {search_value}", yaxis_title="Value")
+                st.plotly_chart(fig_emp)
+
     # 🏢 Bulk Prediction Option
     if st.checkbox("📂 Predict for All Employees"):
-        feature_cols = [col for col in df.columns if col.lower() not in ["employee_id", "name", "absenteeism_risk"]]
-        df["Prediction"] = model.predict(df[feature_cols])
-        df["Risk Probability (%)"] = model.predict_proba(df[feature_cols])[:, 1] * 100
+        X = feature_matrix(df, feature_cols)
+        preds, probs = bulk_predict(X)
+        # One assign adds both columns in a single block-manager insert and leaves
+        # the session-state DataFrame untouched across reruns
+        df = df.assign(**{"Prediction": preds, "Risk Probability (%)": probs})
 
         # 🔽 Download Predictions
         st.subheader("📊 Predictions for All Employees")
         st.dataframe(df[[search_column, "Prediction", "Risk Probability (%)"]] if search_column else df)
-        st.download_button("📥 Download Predictions", df.to_csv(index=False), file_name="Predictions.csv")
+        st.download_button("📥 Download Predictions", to_csv_bytes(df), file_name="Predictions.csv", mime="text/csv")
 
 # 🔄 Reset Button (Removes Data for Security)
 if st.button("🔄 Reset"):
     st.session_state.df = None
+    st.session_state.search_column = None
+    st.session_state.feature_cols = None
     st.session_state.selected_employee = None
-    st.experimental_rerun()
+    st.session_state.last_file_hash = None
+    st.rerun()
@@ -0,0 +1,78 @@
+"""Numba-accelerated RandomForest inference.
+
+Packs every tree of a fitted sklearn RandomForestClassifier into flat
+per-tree arrays and walks them in a parallel JIT kernel over a
+contiguous float32 feature matrix. The packed tree arrays are small
+enough to stay cache-resident while samples stream through in prange.
+
+Numba is optional: when it is not installed, NUMBA_AVAILABLE is False
+and callers should fall back to model.predict_proba.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def pack_forest(model):
+    """Flatten a forest's trees into (n_trees, max_nodes) arrays.
+
+    Returns (n_features, feature, threshold, left, right, value) where
+    value holds each node's positive-class probability. Leaf nodes keep
+    sklearn's negative feature sentinel, which the kernel uses as its
+    stop test.
+    """
+    trees = [est.tree_ for est in model.estimators_]
+    n_trees = len(trees)
+    max_nodes = max(t.node_count for t in trees)
+
+    feature = np.full((n_trees, max_nodes), -2, dtype=np.int64)
+    threshold = np.zeros((n_trees, max_nodes), dtype=np.float32)
+    left = np.zeros((n_trees, max_nodes), dtype=np.int64)
+    right = np.zeros((n_trees, max_nodes), dtype=np.int64)
+    value = np.zeros((n_trees, max_nodes), dtype=np.float32)
+
+    for t, tree in enumerate(trees):
+        n = tree.node_count
+        feature[t, :n] = tree.feature
+        threshold[t, :n] = tree.threshold
+        left[t, :n] = tree.children_left
+        right[t, :n] = tree.children_right
+        counts = tree.value[:, 0, :]
+        value[t, :n] = counts[:, 1] / counts.sum(axis=1)
+
+    return model.n_features_in_, feature, threshold, left, right, value
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _proba_kernel(X, feature, threshold, left, right, value):
+        n_samples = X.shape[0]
+        n_trees = feature.shape[0]
+        out = np.empty(n_samples, dtype=np.float32)
+        for i in prange(n_samples):
+            acc = 0.0
+            for t in range(n_trees):
+                node = 0
+                while feature[t, node] >= 0:
+                    if X[i, feature[t, node]] <= threshold[t, node]:
+                        node = left[t, node]
+                    else:
+                        node = right[t, node]
+                acc += value[t, node]
+            out[i] = acc / n_trees
+        return out
+
+
+def predict_proba_packed(packed, X):
+    """Positive-class probabilities for X using a packed forest."""
+    n_features, feature, threshold, left, right, value = packed
+    if X.shape[1] != n_features:
+        raise ValueError(
+            f"X has {X.shape[1]} features, but the packed forest is expecting {n_features}"
+        )
+    return _proba_kernel(X, feature, threshold, left, right, value)